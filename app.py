@@ -1,15 +1,22 @@
+import csv
+import functools
 import os
 import sqlite3
-import json
+import queue
+import threading
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, g
-import pandas as pd
+from flask import Flask, render_template, request, jsonify, g, Response, stream_with_context
+import orjson
 
-# 確保在執行程式碼前安裝 Flask 和 pandas
-# pip install flask pandas
+# 確保在執行程式碼前安裝 Flask 和 orjson
+# pip install flask orjson
 
 app = Flask(__name__)
 
+def _json_response(payload):
+    """以 orjson 序列化回應：比標準庫 json 快數倍，輸出即為 bytes"""
+    return Response(orjson.dumps(payload), mimetype='application/json')
+
 # --- 檔案與資料庫設定 ---
 # 確保這些 CSV 檔案存在於 app.py 相同的目錄下
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -19,84 +26,207 @@ INGREDIENTS_DB_CSV_FILE = os.path.join(BASE_DIR, '食譜資料.xlsx - Ingredient
 
 # --- 輔助函數 ---
 
+# 連線池：每個請求從池裡借一條現成連線，結束時歸還，
+# 省掉每次請求重新 connect + 重設 PRAGMA 的成本
+_connection_pool = queue.SimpleQueue()
+
+def _make_connection():
+    """建立一條已調好 PRAGMA 的連線 (check_same_thread=False 讓池可跨執行緒共用)"""
+    # cached_statements 調大讓熱路徑的 INSERT/SELECT 在連線存活期間保持已編譯；
+    # isolation_level=None 關掉 sqlite3 的隱式交易推斷，交易一律用明確的 BEGIN
+    db = sqlite3.connect(DATABASE, check_same_thread=False,
+                         cached_statements=256, isolation_level=None)
+    db.row_factory = sqlite3.Row  # 讓結果可以用字典方式存取
+    # 調整 PRAGMA：WAL + synchronous=NORMAL 讓每次 commit 少掉一次 fsync，
+    # 寫入延遲大幅降低；temp_store / cache_size 則把暫存與頁快取留在記憶體
+    # (journal_mode=WAL 會寫進 DB 檔本身，重複執行沒有額外成本)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA temp_store=MEMORY")
+    db.execute("PRAGMA cache_size=-20000")
+    # mmap 讓讀取直接映射資料庫頁，省掉 pread 往返 (上限 256MB，遠大於本庫)
+    db.execute("PRAGMA mmap_size=268435456")
+    return db
+
 def get_db():
-    """連線到資料庫"""
+    """從連線池取得資料庫連線"""
     db = getattr(g, '_database', None)
     if db is None:
-        db = g._database = sqlite3.connect(DATABASE)
-        db.row_factory = sqlite3.Row  # 讓結果可以用字典方式存取
+        try:
+            db = _connection_pool.get_nowait()
+        except queue.Empty:
+            db = _make_connection()
+        g._database = db
     return db
 
 @app.teardown_appcontext
 def close_connection(exception):
-    """應用程式結束時關閉資料庫連線"""
+    """請求結束時把連線歸還連線池 (不真正關閉)"""
     db = getattr(g, '_database', None)
     if db is not None:
-        db.close()
+        db.rollback()  # 保險：避免把沒收尾的交易帶回池裡
+        _connection_pool.put(db)
+
+# 參與烘焙百分比換算的麵團類分組：frozenset 讓成員判斷是 O(1) 雜湊查找，
+# 也不必每次呼叫重建 list 實字。
+# 注意：這份名單必須與前端 (index.html) 的 percentageGroups 完全一致，
+# 否則換算基準的麵粉總重會跟畫面上預填的數字對不起來
+_PCT_GROUPS = frozenset(('中種', '主麵團', '主面团', '中种'))
+
+def is_percentage_group(group_name):
+    """判斷分組是否參與烘焙百分比換算 (麵團類分組)"""
+    return group_name in _PCT_GROUPS
+
+def is_flour_ingredient(name):
+    """判斷食材是否為麵粉類 (作為百分比換算的基準)"""
+    # '麵粉' in name 是 '粉' in name 的子集，單一子字串判斷即可，
+    # 也省掉每列一個 generator 的額外開銷
+    return '粉' in name
 
 def normalize_percent_value(p):
-    """標準化百分比值：將百分比字串或大於1的數字轉為小數"""
+    """把百分比輸入正規化成 0-1 的小數 (如 '50%' -> 0.5、70 -> 0.7)。
+
+    正規化只在寫入時做一次，資料表存的就是最終值：
+    存好的 1.1 代表 110%，不能再被「>1 就除以 100」的規則誤傷。
+    """
     if p is None or p == "":
         return None
     try:
         if isinstance(p, str) and p.endswith('%'):
-            n = float(p.strip().replace('%', ''))
-            return n / 100
-        n = float(p)
-        return n / 100 if n > 1 else n
+            return float(p.strip().replace('%', '')) / 100
+        value = float(p)
+        return value / 100 if value > 1 else value
     except ValueError:
         return None
 
 # --- 資料庫初始化與載入 ---
 
+_RECIPE_INSERT_SQL = """
+    INSERT INTO recipes
+    (RecipeName, IngredientGroup, IngredientName, Weight_g, Percentage, Description, Steps, Timestamp, UpperTemp, LowerTemp, BakeTime, Convection, Steam)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def _parse_float(x):
+    """CSV 儲存格轉 float，空值或無法解析回傳 None"""
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return None
+
+def _parse_int(x):
+    """CSV 儲存格轉 int (容許 '200.0' 這類格式)，空值或無法解析回傳 None"""
+    try:
+        return int(float(x))
+    except (TypeError, ValueError):
+        return None
+
 def load_initial_csv_data(db):
     """從 CSV 檔案載入初始數據到 SQLite 資料庫"""
     print("INFO: 正在執行初始 CSV 數據載入...")
+
+    # 一次性的批次寫入：載入期間獨占檔案鎖、關掉 fsync、journal 留在記憶體。
+    # 只在啟動時對空資料庫這麼做才安全 —— 中途失敗的話下次啟動會重新載入
+    db.execute("PRAGMA locking_mode=EXCLUSIVE")
+    db.execute("PRAGMA synchronous=OFF")
+    db.execute("PRAGMA journal_mode=MEMORY")
     try:
-        # 1. 載入食譜數據 (recipes)
-        if os.path.exists(RECIPES_CSV_FILE):
-            recipes_df = pd.read_csv(RECIPES_CSV_FILE)
-            
-            # 【關鍵】定義 CSV 標頭到資料庫欄位的映射
-            column_map = {
-                '食譜名稱': 'RecipeName', '分組': 'IngredientGroup', '食材': 'IngredientName',
-                '重量(g)': 'Weight_g', '百分比': 'Percentage_CSV', '說明': 'Description',
-                '步驟': 'Steps', '建立時間': 'Timestamp', '上火溫度': 'UpperTemp',
-                '下火溫度': 'LowerTemp', '烘烤時間': 'BakeTime', '旋風': 'Convection',
-                '蒸汽': 'Steam'
-            }
-            
-            recipes_df = recipes_df.rename(columns=column_map)
-            
-            # 轉換百分比並設置為 'Percentage' 欄位
-            recipes_df['Percentage'] = recipes_df['Percentage_CSV'].apply(normalize_percent_value)
-            recipes_df = recipes_df.drop(columns=['Percentage_CSV'])
-            
-            # 確保所有需要的欄位存在 (如果 CSV 缺少欄位會在這裡出錯)
-            required_recipe_cols = ['RecipeName', 'IngredientGroup', 'IngredientName', 'Weight_g', 'Percentage', 'Description', 'Steps', 'Timestamp', 'UpperTemp', 'LowerTemp', 'BakeTime', 'Convection', 'Steam']
-            recipes_df = recipes_df.reindex(columns=required_recipe_cols)
-
-            recipes_df.to_sql('recipes', db, if_exists='append', index=False)
-            print(f"INFO: 成功載入 {len(recipes_df)} 筆初始食譜紀錄到 'recipes' 表。")
-
-        # 2. 載入食材資料庫數據 (ingredients_db)
-        if os.path.exists(INGREDIENTS_DB_CSV_FILE):
-             ingredients_df = pd.read_csv(INGREDIENTS_DB_CSV_FILE)
-             ingredients_df = ingredients_df.rename(columns={'name': 'Name', 'hydration': 'Hydration'})
-             ingredients_df['Hydration'] = pd.to_numeric(ingredients_df['Hydration'], errors='coerce').fillna(0)
-
-             ingredients_df.to_sql('ingredients_db', db, if_exists='append', index=False)
-             print(f"INFO: 成功載入 {len(ingredients_df)} 筆初始食材紀錄到 'ingredients_db' 表。")
+        # 整個初始載入包在同一個交易裡，兩張表只付一次 commit/fsync 的成本
+        # (連線是 isolation_level=None 的 autocommit 模式，所以要明確 BEGIN；
+        #  with db: 負責在離開區塊時 COMMIT / 出錯時 ROLLBACK)
+        with db:
+            db.execute("BEGIN")
+            # 1. 載入食譜數據 (recipes)
+            if os.path.exists(RECIPES_CSV_FILE):
+                # 標準庫 csv 串流讀取：不建 DataFrame、不付 pandas 匯入成本，
+                # 逐列轉型後以 10,000 列為單位 executemany 批次寫入
+                csv_fields = ('食譜名稱', '分組', '食材', '重量(g)', '百分比', '說明',
+                              '步驟', '建立時間', '上火溫度', '下火溫度', '烘烤時間', '旋風', '蒸汽')
+                total_rows = 0
+
+                with open(RECIPES_CSV_FILE, newline='', encoding='utf-8-sig') as f:
+                    reader = csv.reader(f)
+                    header = [h.strip() for h in next(reader)]
+                    # 欄位映射：CSV 標頭可能換順序，(如果 CSV 缺少欄位會在這裡出錯)
+                    (i_name, i_group, i_ing, i_weight, i_pct, i_desc, i_steps,
+                     i_ts, i_up, i_low, i_bake, i_conv, i_steam) = (header.index(c) for c in csv_fields)
+
+                    rows = []
+                    for r in reader:
+                        if len(r) < len(header) or not r[i_name].strip():
+                            continue  # 跳過空行與殘缺列
+                        rows.append((
+                            r[i_name], r[i_group], r[i_ing],
+                            _parse_float(r[i_weight]),
+                            normalize_percent_value(r[i_pct]),
+                            r[i_desc] or None, r[i_steps] or None, r[i_ts] or None,
+                            _parse_int(r[i_up]), _parse_int(r[i_low]), _parse_int(r[i_bake]),
+                            r[i_conv] or None, r[i_steam] or None,
+                        ))
+                        if len(rows) >= 10000:
+                            db.executemany(_RECIPE_INSERT_SQL, rows)
+                            total_rows += len(rows)
+                            rows.clear()
+
+                    if rows:
+                        db.executemany(_RECIPE_INSERT_SQL, rows)
+                        total_rows += len(rows)
+
+                print(f"INFO: 成功載入 {total_rows} 筆初始食譜紀錄到 'recipes' 表。")
+
+            # 2. 載入食材資料庫數據 (ingredients_db)
+            if os.path.exists(INGREDIENTS_DB_CSV_FILE):
+                with open(INGREDIENTS_DB_CSV_FILE, newline='', encoding='utf-8-sig') as f:
+                    reader = csv.reader(f)
+                    header = [h.strip() for h in next(reader)]
+                    i_ing_name = header.index('name')
+                    i_hydration = header.index('hydration')
+
+                    ing_rows = [(r[i_ing_name], _parse_float(r[i_hydration]) or 0)
+                                for r in reader
+                                if len(r) >= len(header) and r[i_ing_name].strip()]
+
+                db.executemany("INSERT INTO ingredients_db (Name, Hydration) VALUES (?, ?)", ing_rows)
+                print(f"INFO: 成功載入 {len(ing_rows)} 筆初始食材紀錄到 'ingredients_db' 表。")
 
     except Exception as e:
         print(f"ERROR: 初始數據載入失敗: {e}")
+    finally:
+        # 載入完畢切回平時的安全設定 (與 _make_connection 一致)。
+        # 順序有講究：要先離開 EXCLUSIVE 再進 WAL —— 在 EXCLUSIVE 下進了 WAL
+        # 的連線，SQLite 不讓它再切回 NORMAL，會抱著獨占鎖直到程序結束，
+        # 其他連線 (連線池的第二條、其他 Gunicorn worker) 全部 database is locked
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("PRAGMA locking_mode=NORMAL")
+        db.execute("PRAGMA journal_mode=WAL")
+        # locking_mode=NORMAL 要到下一次實際存取才釋放鎖，主動讀一次讓它立刻生效
+        db.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
 
-def init_db():
-    """初始化資料庫結構，並在資料庫為空時從 CSV 載入資料。"""
+def _needs_rebuild(db_path, source_files):
+    """資料庫檔不存在、或任一來源 CSV 比它新時，表示初始資料需要重建"""
+    if not os.path.exists(db_path):
+        return True
+    db_mtime = os.path.getmtime(db_path)
+    return any(os.path.exists(f) and os.path.getmtime(f) > db_mtime for f in source_files)
+
+def init_db(force=False):
+    """初始化資料庫結構，並在需要時從 CSV 載入資料。"""
     with app.app_context():
         db = get_db()
         cursor = db.cursor()
-        
+
+        # 舊版 schema 把百分比拆成 Percentage_Raw + generated column，
+        # 會對大於 100% 的值重複除以 100。偵測到就整表砍掉，
+        # 下方的空表檢查會觸發從 CSV 重新載入 (資料庫本來就是 CSV 的衍生物)
+        legacy_schema = cursor.execute(
+            "SELECT 1 FROM pragma_table_info('recipes') WHERE name = 'Percentage_Raw'"
+        ).fetchone()
+        if legacy_schema:
+            print("INFO: 偵測到舊版 recipes schema，砍掉重建並重新載入 CSV。")
+            cursor.execute("DROP TABLE recipes")
+            # ingredients_db 會跟著 recipes 一起重新載入，先清空避免主鍵衝突
+            cursor.execute("DELETE FROM ingredients_db")
+
         # 1. 建立食譜主表
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS recipes (
@@ -125,17 +255,37 @@ def init_db():
             )
         """)
         
+        # 3. 建立索引：讀取端的 ORDER BY RecipeName, id 可直接走索引順序，
+        #    刪除 / 查詢單一食譜時也從全表掃描變成 B-tree 搜尋
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_recipes_name ON recipes(RecipeName, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_recipes_ts ON recipes(Timestamp DESC)")
+
         db.commit()
 
-        # 3. 檢查並載入初始 CSV 資料 (僅在表格為空時載入)
+        # 4. 檢查並載入初始 CSV 資料
+        #    (表格為空、CSV 比資料庫檔新、或 force 重建時才載入；
+        #     其他情況 —— 例如 Gunicorn 的第二個以上 worker —— 直接跳過)
         try:
             recipe_count = cursor.execute("SELECT COUNT(*) FROM recipes").fetchone()[0]
-            if recipe_count == 0:
-                load_initial_csv_data(db)
         except Exception as e:
             # 如果 COUNT(*) 失敗，可能表格剛創建，也嘗試載入
             print(f"WARNING: 檢查表格是否為空時發生錯誤 ({e})，將嘗試載入 CSV 數據。")
+            recipe_count = 0
+
+        if force or recipe_count == 0 or _needs_rebuild(DATABASE, [RECIPES_CSV_FILE, INGREDIENTS_DB_CSV_FILE]):
+            if recipe_count:
+                print("INFO: CSV 來源檔比資料庫新，重新載入初始資料。")
+                cursor.execute("DELETE FROM recipes")
+                cursor.execute("DELETE FROM ingredients_db")
             load_initial_csv_data(db)
+            # 蒐集統計讓查詢規劃器知道該走 idx_recipes_name / idx_recipes_ts
+            db.execute("ANALYZE")
+
+@app.cli.command("init-db")
+def init_db_command():
+    """強制從 CSV 重建資料庫 (可在部署的 build 階段先烤好 DB，worker 啟動就不用再載入)"""
+    init_db(force=True)
+    print("INFO: 資料庫重建完成。")
 
 # --- 應用程式啟動時強制執行初始化 (解決 Gunicorn 問題) ---
 # 這一行會確保在應用程式啟動時，無論是使用 flask run 還是 gunicorn，都會執行初始化。
@@ -143,60 +293,144 @@ init_db()
 
 # --- 資料轉換和讀取函數 (已修正 JSON 序列化問題) ---
 
+# 食譜快取：資料只在 save/delete 時改變，重複的 GET 不必每次重掃資料庫。
+# _recipe_index 以食譜名稱為鍵，讓單一食譜查詢變成 dict 查表。
+# 用鎖保護，因為 Flask (與 Gunicorn 的多執行緒 worker) 可能同時處理多個請求
+_recipes_cache = None
+_recipe_index = None
+_recipe_list_json = None  # /get_recipe_list 的預編碼 bytes，隨快取一起失效
+_flour_totals = None      # title -> 百分比分組內的麵粉總重，換算路由直接查表
+_conversion_rows = None   # title -> [(食材 dict, 重量, 是否百分比分組), ...]
+_recipes_cache_version = 0  # 單調遞增的失效計數，讓回填能辨識「讀取期間已有寫入」
+_recipes_cache_lock = threading.Lock()
+
+def invalidate_recipes_cache():
+    """寫入路由 (save/delete) 成功 commit 後呼叫，讓下次讀取重建快取"""
+    global _recipes_cache, _recipe_index, _recipe_list_json, _flour_totals, _conversion_rows
+    global _recipes_cache_version
+    with _recipes_cache_lock:
+        _recipes_cache_version += 1
+        _recipes_cache = None
+        _recipe_index = None
+        _recipe_list_json = None
+        _flour_totals = None
+        _conversion_rows = None
+    _cached_conversion_bytes.cache_clear()
+
+def _recipe_flour_total(ingredients):
+    """百分比分組內的麵粉總重 (烘焙百分比換算的基準)"""
+    return sum(
+        ing['weight'] for ing in ingredients
+        if ing['weight'] and is_flour_ingredient(ing['name']) and is_percentage_group(ing['group'])
+    )
+
+def _prepare_conversion_rows(ingredients):
+    """把食材列表攤平成 (dict, 重量, 是否百分比分組) 平行列，
+    換算請求就不必每列重跑分組判斷"""
+    return [(ing, ing['weight'], is_percentage_group(ing['group'])) for ing in ingredients]
+
+def _fill_recipes_cache(recipes_list, version):
+    """以讀取結果回填快取、名稱索引與換算用的預運算表。
+
+    version 是讀取開始前取樣的 _recipes_cache_version；若讀取期間有寫入
+    失效 (計數已前進)，這份結果是寫入前的舊快照，直接丟棄不回填 ——
+    只看 `_recipes_cache is None` 分不出「冷快取」和「剛被失效」。
+    """
+    global _recipes_cache, _recipe_index, _flour_totals, _conversion_rows
+    with _recipes_cache_lock:
+        if _recipes_cache is None and _recipes_cache_version == version:
+            _recipes_cache = recipes_list
+            _recipe_index = {r['title']: r for r in recipes_list}
+            _flour_totals = {r['title']: _recipe_flour_total(r['ingredients'])
+                             for r in recipes_list}
+            _conversion_rows = {r['title']: _prepare_conversion_rows(r['ingredients'])
+                                for r in recipes_list}
+
+def iter_recipes_data(db):
+    """逐筆產出食譜物件 (前端需要的結構)。
+
+    單次掃描：查詢已按 RecipeName 排序，直接在名稱切換時送出前一筆，
+    不經過 DataFrame / groupby / iterrows (逐列裝箱成 Python 物件非常慢)。
+    """
+    cur = db.cursor()
+    cur.row_factory = None  # 欄位順序固定，直接解包 tuple，省掉每列包 sqlite3.Row
+    rows = cur.execute("""
+        SELECT RecipeName, IngredientGroup, IngredientName, Weight_g, Percentage,
+               Description, Steps, Timestamp, UpperTemp, LowerTemp, BakeTime, Convection, Steam
+        FROM recipes ORDER BY RecipeName, id
+    """)
+
+    current = None
+
+    for (name, group, ing_name, weight, percent, desc,
+         steps, timestamp, upper, lower, bake, convection, steam) in rows:
+        if current is None or current['title'] != name:
+            if current is not None:
+                yield current
+            # sqlite3 回傳的已是標準 Python 型別 (int/float/str/None)
+            current = {
+                'title': name,
+                'steps': steps,
+                'timestamp': timestamp,
+                'baking': {
+                    'topHeat': upper,
+                    'bottomHeat': lower,
+                    'time': bake,
+                    'convection': convection == '是',
+                    'steam': steam == '是',
+                },
+                'ingredients': [],
+            }
+
+        current['ingredients'].append({
+            'group': group,
+            'name': ing_name,
+            'weight': weight,
+            'percent': percent,
+            'desc': desc,
+        })
+
+    if current is not None:
+        yield current
+
 def get_all_recipes_data():
     """從資料庫讀取所有食譜資料並整理成前端需要的結構"""
-    db = get_db()
-    
-    # 讀取所有資料
-    df = pd.read_sql_query("SELECT * FROM recipes ORDER BY RecipeName, id", db)
+    global _recipes_cache
+    with _recipes_cache_lock:
+        if _recipes_cache is not None:
+            return _recipes_cache
+        version = _recipes_cache_version
 
-    if df.empty:
-        return []
+    recipes_list = list(iter_recipes_data(get_db()))
+    _fill_recipes_cache(recipes_list, version)
+    return recipes_list
 
-    # 按食譜名稱分組
-    recipes_grouped = df.groupby('RecipeName')
-    
-    recipes_list = []
+# 前端食材物件的鍵，順序對應 get_single_recipe 的 SELECT 欄位
+_INGREDIENT_KEYS = ('group', 'name', 'weight', 'percent', 'desc')
 
-    for name, group in recipes_grouped:
-        first_row = group.iloc[0]
-        
-        # 提取烘烤資訊 - 【關鍵修正：使用 int() 或 float() 確保轉換為標準 Python 類型】
-        baking_info = {
-            # 使用 pd.notna 檢查值是否為 NaN/None，並將其強制轉換為 int 或 None
-            'topHeat': int(first_row['UpperTemp']) if pd.notna(first_row['UpperTemp']) else None,
-            'bottomHeat': int(first_row['LowerTemp']) if pd.notna(first_row['LowerTemp']) else None,
-            'time': int(first_row['BakeTime']) if pd.notna(first_row['BakeTime']) else None,
-            'convection': first_row['Convection'] == '是',
-            'steam': first_row['Steam'] == '是',
-        }
-        
-        # 整理食材列表
-        ingredients = []
-        for _, row in group.iterrows():
-            ingredients.append({
-                'group': row['IngredientGroup'],
-                'name': row['IngredientName'],
-                # 確保 weight 和 percent 轉換為標準 Python float
-                'weight': float(row['Weight_g']) if pd.notna(row['Weight_g']) else None,
-                'percent': float(row['Percentage']) if pd.notna(row['Percentage']) else None, 
-                'desc': row['Description'],
-            })
+def get_single_recipe(name):
+    """讀取單一食譜的食材列表 (dict 形式)。
 
-        # 整理食譜物件
-        recipe_obj = {
-            'title': name,
-            'steps': first_row['Steps'],
-            'timestamp': first_row['Timestamp'],
-            'baking': baking_info,
-            'ingredients': ingredients,
-        }
-        recipes_list.append(recipe_obj)
-        
-    return recipes_list
+    快取溫的時候是一次 dict 查表；冷快取才退回資料庫
+    (透過 idx_recipes_name 索引，只撈換算需要的欄位)。
+    """
+    with _recipes_cache_lock:
+        index = _recipe_index
+    if index is not None:
+        recipe = index.get(name)
+        return recipe['ingredients'] if recipe else []
+
+    db = get_db()
+    cur = db.cursor()
+    cur.row_factory = None  # SELECT 欄位順序 = _INGREDIENT_KEYS，tuple 配 zip 組 dict 即可
+    rows = cur.execute("""
+        SELECT IngredientGroup, IngredientName, Weight_g, Percentage, Description
+        FROM recipes WHERE RecipeName = ? ORDER BY id
+    """, (name,)).fetchall()
+    return [dict(zip(_INGREDIENT_KEYS, row)) for row in rows]
 
 
-# --- 路由定義 (保持不變) ---
+# --- 路由定義 ---
 
 @app.route('/')
 def index():
@@ -204,11 +438,35 @@ def index():
 
 @app.route('/get_recipes', methods=['GET'])
 def get_recipes_route():
-    recipes = get_all_recipes_data()
-    return jsonify(recipes)
+    """串流輸出 JSON 陣列：一邊從資料庫讀一邊送出，不先在記憶體組完整串"""
+    def generate():
+        global _recipes_cache
+        with _recipes_cache_lock:
+            cached = _recipes_cache
+            version = _recipes_cache_version
 
-# ... (其他路由如 save_recipe, delete_recipe, get_ingredients_db, get_stats, calculate_conversion 保持不變)
-# 為了避免冗長，我僅顯示關鍵修正部分。您應該使用我前一次提供的完整 app.py 的 **所有** 路由定義。
+        if cached is not None:
+            recipes = cached
+            collected = None
+        else:
+            recipes = iter_recipes_data(get_db())
+            collected = []  # 邊串流邊蒐集，結束後回填快取
+
+        yield b'['
+        first = True
+        for recipe in recipes:
+            if collected is not None:
+                collected.append(recipe)
+            prefix = b'' if first else b','
+            yield prefix + orjson.dumps(recipe)
+            first = False
+        yield b']'
+
+        if collected is not None:
+            # 串流橫跨整個下載，期間若有寫入失效，版本比對會讓回填放棄這份舊快照
+            _fill_recipes_cache(collected, version)
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @app.route('/save_recipe', methods=['POST'])
 def save_recipe_route():
@@ -229,35 +487,38 @@ def save_recipe_route():
     timestamp = datetime.now().isoformat()
     
     try:
+        # 一次性組好所有參數，用單次 executemany 批次寫入，
+        # 避免每個食材都經過一次 Python -> sqlite3 的往返
+        # 這裡的 ing['percent'] 來自前端表單，可能是字串 (如 '50%') 或數字
+        rows = [(
+            title,
+            ing.get('group'),
+            ing.get('name'),
+            ing.get('weight'),
+            normalize_percent_value(ing.get('percent')),
+            ing.get('desc'),
+            steps,
+            timestamp,
+            baking_info.get('topHeat'),
+            baking_info.get('bottomHeat'),
+            baking_info.get('time'),
+            '是' if baking_info.get('convection') else '否',
+            '是' if baking_info.get('steam') else '否',
+        ) for ing in ingredients]
+
+        cursor.execute("BEGIN")
         if is_update:
             cursor.execute("DELETE FROM recipes WHERE RecipeName = ?", (title,))
-        
-        for ing in ingredients:
-            # 這裡的 ing['percent'] 來自前端表單，可能是字串 (如 '50%') 或數字
-            percent_norm = normalize_percent_value(ing.get('percent'))
-            
-            cursor.execute("""
-                INSERT INTO recipes 
-                (RecipeName, IngredientGroup, IngredientName, Weight_g, Percentage, Description, Steps, Timestamp, UpperTemp, LowerTemp, BakeTime, Convection, Steam)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                title,
-                ing.get('group'),
-                ing.get('name'),
-                ing.get('weight'),
-                percent_norm,
-                ing.get('desc'),
-                steps,
-                timestamp,
-                baking_info.get('topHeat'),
-                baking_info.get('bottomHeat'),
-                baking_info.get('time'),
-                '是' if baking_info.get('convection') else '否',
-                '是' if baking_info.get('steam') else '否',
-            ))
-            
+
+        cursor.executemany("""
+            INSERT INTO recipes
+            (RecipeName, IngredientGroup, IngredientName, Weight_g, Percentage, Description, Steps, Timestamp, UpperTemp, LowerTemp, BakeTime, Convection, Steam)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
         db.commit()
-        
+        invalidate_recipes_cache()
+
         message = f"食譜 '{title}' {'更新' if is_update else '新增'}成功！"
         return jsonify({"status": "success", "message": message})
         
@@ -266,7 +527,175 @@ def save_recipe_route():
         print(f"Database error: {e}")
         return jsonify({"status": "error", "message": f"儲存食譜失敗: {str(e)}"}), 500
 
-# [Please ensure all other routes from the previous comprehensive app.py are included here.]
+@app.route('/get_recipe_list', methods=['GET'])
+def get_recipe_list_route():
+    """回傳所有食譜名稱 (排序後)。快取溫的時候直接回已編碼的 bytes，不碰資料庫"""
+    global _recipe_list_json
+    with _recipes_cache_lock:
+        cached = _recipes_cache
+        encoded = _recipe_list_json
+
+    if encoded is not None:
+        return Response(encoded, mimetype='application/json')
+
+    if cached is not None:
+        # 快取本身就是按 RecipeName 排序建出來的；編碼一次後重複使用
+        encoded = orjson.dumps([r['title'] for r in cached])
+        with _recipes_cache_lock:
+            if _recipes_cache is cached:
+                _recipe_list_json = encoded
+        return Response(encoded, mimetype='application/json')
+
+    db = get_db()
+    cur = db.cursor()
+    cur.row_factory = None  # 只做位置存取，省掉每列包一層 sqlite3.Row
+    names = [row[0] for row in cur.execute(
+        "SELECT DISTINCT RecipeName FROM recipes ORDER BY RecipeName").fetchall()]
+    return _json_response(names)
+
+@app.route('/get_stats', methods=['GET'])
+def get_stats_route():
+    """回傳統計數據：全部交給 SQL 聚合，一次查詢拿回四個純量"""
+    db = get_db()
+
+    cur = db.cursor()
+    cur.row_factory = None  # 聚合結果以位置解包，不需要 sqlite3.Row 的欄名存取
+
+    # Timestamp 是 datetime.isoformat() 產生的 ISO-8601 字串，
+    # 字典序即時間序，ORDER BY Timestamp DESC 可直接走 idx_recipes_ts
+    row = cur.execute("""
+        SELECT COUNT(DISTINCT RecipeName),
+               COUNT(*),
+               COALESCE(SUM(Weight_g), 0),
+               (SELECT RecipeName FROM recipes ORDER BY Timestamp DESC LIMIT 1)
+        FROM recipes
+    """).fetchone()
+
+    total_recipes, total_ingredients, total_weight, latest_recipe = row
+
+    return _json_response({
+        'totalRecipes': total_recipes,
+        'totalIngredients': total_ingredients,
+        'avgWeight': total_weight / total_recipes if total_recipes else 0,
+        'latestRecipe': latest_recipe or '-',
+    })
+
+@app.route('/delete_recipe', methods=['POST'])
+def delete_recipe_route():
+    """刪除指定名稱的食譜 (透過 idx_recipes_name 索引直接定位，不必掃全表)"""
+    data = request.get_json()
+    recipe_name = data.get('recipeName')
+
+    if not recipe_name:
+        return jsonify({"status": "error", "message": "未提供食譜名稱"}), 400
+
+    db = get_db()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute("DELETE FROM recipes WHERE RecipeName = ?", (recipe_name,))
+        db.commit()
+        invalidate_recipes_cache()
+
+        if cursor.rowcount == 0:
+            return jsonify({"status": "error", "message": f"找不到食譜 '{recipe_name}'"}), 404
+
+        return jsonify({"status": "success", "message": f"食譜 '{recipe_name}' 已刪除。"})
+
+    except Exception as e:
+        db.rollback()
+        print(f"Database error: {e}")
+        return jsonify({"status": "error", "message": f"刪除食譜失敗: {str(e)}"}), 500
+
+@functools.lru_cache(maxsize=4096)
+def _cached_conversion_bytes(version, recipe_name, new_total_flour, include_non_percentage_groups):
+    """計算換算結果，回傳已編碼的 orjson bytes (找不到食譜或沒有麵粉時回傳 None)。
+
+    參數空間很小 (食譜名稱 × 進位到 0.1g 的目標麵粉量 × 布林)，LRU 命中時
+    整個請求只剩一次查表加一個現成的 bytes 物件；寫入路由清空此快取。
+
+    version 是呼叫端取樣的 _recipes_cache_version。lru_cache 是函數返回後
+    才寫入快取，寫入路由的 cache_clear() 攔不住「算到一半」的舊結果；
+    把版本編進鍵裡，過期的插入就永遠不會再被命中
+    (與 _fill_recipes_cache 的版本比對是同一套防線)。
+    """
+    ingredients = get_single_recipe(recipe_name)
+    if not ingredients:
+        return None
+
+    # 以百分比分組內的麵粉總重為基準計算換算比例
+    # (快取建好時已算過每個食譜的總重與分組判斷，這裡只是查表；冷快取才現算)
+    with _recipes_cache_lock:
+        totals = _flour_totals
+        conv_rows = _conversion_rows
+
+    if totals is not None and recipe_name in totals:
+        original_total_flour = totals[recipe_name]
+    else:
+        original_total_flour = _recipe_flour_total(ingredients)
+
+    if not original_total_flour:
+        return None
+
+    conversion_ratio = new_total_flour / original_total_flour
+    ratio10 = conversion_ratio * 10.0
+
+    prepared = conv_rows.get(recipe_name) if conv_rows is not None else None
+    if prepared is None:
+        prepared = _prepare_conversion_rows(ingredients)
+
+    # 熱迴圈只剩乘法與進位：以 int(x*10+0.5)/10 取整到 0.1g，
+    # 不經過 round() 的函數呼叫與 __round__ 派發 (重量皆為非負值)
+    converted_ingredients = []
+    for ing, weight, is_pct in prepared:
+        if weight is not None and (is_pct or include_non_percentage_groups):
+            # 只有真的要改重量的列才配置新 dict (快取來源不可就地修改)
+            converted_ingredients.append({
+                'group': ing['group'],
+                'name': ing['name'],
+                'weight': int(weight * ratio10 + 0.5) / 10,
+                'percent': ing['percent'],
+                'desc': ing['desc'],
+            })
+        else:
+            # 重量不變的列直接共用原 dict：唯讀使用，隨即被序列化
+            converted_ingredients.append(ing)
+
+    return orjson.dumps({
+        'status': 'success',
+        'originalTotalFlour': original_total_flour,
+        'newTotalFlour': new_total_flour,
+        'conversionRatio': conversion_ratio,
+        'ingredients': converted_ingredients,
+    })
+
+@app.route('/calculate_conversion', methods=['POST'])
+def calculate_conversion_route():
+    """依新的麵粉總量換算食譜 (結果以 LRU 記憶，重複的換算請求直接回快取 bytes)"""
+    data = request.get_json()
+    recipe_name = data.get('recipeName')
+    include_non_percentage_groups = bool(data.get('includeNonPercentageGroups', False))
+
+    try:
+        # 進位到 0.1g：數值上無感，但能大幅提高快取命中率
+        new_total_flour = round(float(data.get('newTotalFlour')), 1)
+    except (TypeError, ValueError):
+        new_total_flour = 0
+
+    if not recipe_name or new_total_flour <= 0:
+        return jsonify({"status": "error", "message": "請提供食譜名稱與有效的目標麵粉總量"}), 400
+
+    with _recipes_cache_lock:
+        version = _recipes_cache_version
+
+    result = _cached_conversion_bytes(version, recipe_name, new_total_flour, include_non_percentage_groups)
+
+    if result is None:
+        if not get_single_recipe(recipe_name):
+            return jsonify({"status": "error", "message": f"找不到食譜 '{recipe_name}'"}), 404
+        return jsonify({"status": "error", "message": "此食譜的百分比分組中沒有麵粉類食材，無法換算"}), 400
+
+    return Response(result, mimetype='application/json')
 
 # --- 伺服器啟動 (僅用於本地開發) ---
 if __name__ == '__main__':